@@ -1,10 +1,16 @@
-import uuid
-import random
+import secrets
 import string
+import uuid
+
+_CODE_ALPHABET = string.ascii_uppercase + string.digits
 
 
 def generate_room_code() -> str:
-    return "".join(random.choices(string.ascii_uppercase + string.digits, k=6))
+    # CSPRNG-backed — room codes shouldn't be predictable from previous ones
+    # the way Mersenne-twister output is. Keeps the full A-Z0-9 alphabet:
+    # hex-only codes would shrink the space from 36^6 to 16^6, close enough
+    # to brute-force an active room.
+    return "".join(secrets.choice(_CODE_ALPHABET) for _ in range(6))
 
 
 def unique_player_name(desired: str, existing_names: list) -> str:
@@ -51,5 +57,6 @@ def make_room(code: str, host_player: dict, host_sid: str) -> dict:
         "phase": "lobby",
         "currentRound": None,
         "roundNumber": 0,
-        "usedObjectIds": [],
+        "timerGeneration": 0,
+        "scores": {host_player["id"]: 0},
     }
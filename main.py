@@ -1,4 +1,14 @@
+import logging
+import logging.handlers
 import os
+import queue
+
+import uvloop
+
+# libuv-based event loop — 2-4x faster on the I/O-bound work that dominates
+# this server (socket.io emits + Redis round trips). Must install before any
+# loop is created, i.e. before uvicorn/socketio import side effects.
+uvloop.install()
 
 import fastapi
 import socketio
@@ -7,9 +17,27 @@ from fastapi.middleware.cors import CORSMiddleware
 import metrics
 import redis_state
 from clip_detector import CLIPDetector
+from object_bank import OBJECTS
 from socket_server import sio
 import socket_server
 
+def _setup_logging() -> None:
+    """Queue-backed logging: emitters only enqueue a record, the stdout write
+    happens on the listener's background thread — never inside the event loop.
+    """
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    stream = logging.StreamHandler()
+    stream.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+    listener = logging.handlers.QueueListener(log_queue, stream)
+    listener.start()
+
+    seekr_log = logging.getLogger("seekr")
+    seekr_log.addHandler(logging.handlers.QueueHandler(log_queue))
+    seekr_log.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
+
+_setup_logging()
+
 app = fastapi.FastAPI()
 
 allowed_origins = os.getenv(
@@ -31,6 +59,7 @@ async def startup():
     await redis_state.init()
     # Load CLIP inside the worker process (after AsyncRedisManager forks)
     detector = CLIPDetector()
+    detector.precompute_all_text_embeddings(OBJECTS)
     socket_server.detector = detector
 
 
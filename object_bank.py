@@ -1632,9 +1632,14 @@ GLOBAL_NULLS = [
 ]
 
 
+# Frozen at import — OBJECTS never changes at runtime, so callers get the
+# same tuple back instead of a fresh list per round
+_ALL_IDS = tuple(OBJECTS.keys())
+
+
 def get_object(object_id: str) -> dict:
     return OBJECTS[object_id]
 
 
-def get_all_ids() -> list[str]:
-    return list(OBJECTS.keys())
+def get_all_ids() -> tuple[str, ...]:
+    return _ALL_IDS
@@ -6,27 +6,95 @@ All room data is stored as JSON with a 2-hour TTL so crashed processes
 don't leave stale rooms, and any uvicorn worker can read shared state.
 """
 
-import json
+import asyncio
+import logging
 import os
+import time
+import uuid
 from typing import Optional
 
+import orjson
 import redis.asyncio as aioredis
 
+log = logging.getLogger("seekr")
+
 _client: aioredis.Redis | None = None
 
 ROOM_TTL = 7200  # seconds (2 hours)
 _SKIP = {"roundTimerTask"}  # asyncio.Task — not serialisable
 
+# Process-local room cache. Our own writes land here directly; writes from
+# other workers invalidate entries via the room_updates pub/sub channel, so
+# the common get_room on the hot path costs zero round trips. Entries carry
+# their write time and age out alongside the Redis key's TTL, so an idle
+# room can't be resurrected from a worker's cache after Redis expired it.
+ROOM_UPDATES_CHANNEL = "room_updates"
+_worker_id = uuid.uuid4().hex  # lets us ignore our own pub/sub echoes
+_room_cache: dict[str, tuple[float, dict]] = {}  # code -> (cached_at, room)
+_invalidation_task: asyncio.Task | None = None
+
+# Claim the round AND bump the winner's score in one atomic round trip —
+# closes the race window of the old GET/mutate/SET on the room JSON
+_CLAIM_AND_SCORE_LUA = """
+if redis.call('SET', KEYS[1], ARGV[1], 'NX', 'EX', '300') then
+    return redis.call('HINCRBY', KEYS[2], ARGV[2], 1)
+else
+    return false
+end
+"""
+_claim_and_score = None  # registered in init()
+
 
 async def init(url: str | None = None) -> None:
-    global _client
+    global _client, _invalidation_task, _claim_and_score
     _client = aioredis.from_url(
         url or os.getenv("REDIS_URL", "redis://localhost:6379"),
         decode_responses=False,
     )
     # Verify connection
     await _client.ping()
-    print("[redis] connected")
+    _claim_and_score = _client.register_script(_CLAIM_AND_SCORE_LUA)
+    _invalidation_task = asyncio.create_task(_watch_room_updates())
+    log.info("[redis] connected")
+
+
+async def _watch_room_updates() -> None:
+    """Drop cached rooms when another worker rewrites them.
+
+    If this task dies the worker serves stale rooms forever, so the
+    subscribe/listen loop must outlive any single connection: on failure we
+    log, clear the whole cache (invalidations were missed while we were
+    deaf), back off briefly and resubscribe.
+    """
+    while True:
+        pubsub = _r().pubsub()
+        try:
+            await pubsub.subscribe(ROOM_UPDATES_CHANNEL)
+            # Anything cached before the subscription was (re)established may
+            # already be stale — start from a cold cache
+            _room_cache.clear()
+            async for message in pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+                data = message["data"]
+                if isinstance(data, bytes):
+                    data = data.decode()
+                code, _, writer = data.partition(":")
+                if writer != _worker_id:
+                    _room_cache.pop(code, None)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            log.warning("[redis] room-updates watcher dropped, resubscribing: %s", e)
+            _room_cache.clear()
+            await asyncio.sleep(1.0)
+        finally:
+            # Release the pool connection before retrying — a flapping Redis
+            # would otherwise leak one per reconnect cycle
+            try:
+                await pubsub.aclose()
+            except Exception:
+                pass
 
 
 def _r() -> aioredis.Redis:
@@ -38,23 +106,63 @@ def _r() -> aioredis.Redis:
 # ── Room CRUD ─────────────────────────────────────────────────────────────────
 
 async def get_room(code: str) -> Optional[dict]:
-    raw = await _r().get(f"room:{code}")
-    return json.loads(raw) if raw else None
+    cached = _room_cache.get(code)
+    if cached is not None:
+        cached_at, room = cached
+        if time.monotonic() - cached_at < ROOM_TTL:
+            return room
+        # Redis has expired the key by now — don't resurrect the room
+        _room_cache.pop(code, None)
+    # Fetch the remaining TTL alongside the value: reads don't refresh the
+    # key's expiry, so the cache entry must be back-dated to expire when the
+    # key does, not a full ROOM_TTL from now
+    async with _r().pipeline(transaction=False) as pipe:
+        pipe.get(f"room:{code}")
+        pipe.ttl(f"room:{code}")
+        raw, ttl = await pipe.execute()
+    if not raw:
+        return None
+    room = orjson.loads(raw)
+    if 0 < ttl <= ROOM_TTL:
+        _room_cache[code] = (time.monotonic() - (ROOM_TTL - ttl), room)
+    return room
 
 
 async def set_room(code: str, room: dict) -> None:
     data = {k: v for k, v in room.items() if k not in _SKIP}
-    await _r().set(f"room:{code}", json.dumps(data), ex=ROOM_TTL)
+    _room_cache[code] = (time.monotonic(), data)
+    async with _r().pipeline(transaction=False) as pipe:
+        pipe.set(f"room:{code}", orjson.dumps(data), ex=ROOM_TTL)
+        pipe.publish(ROOM_UPDATES_CHANNEL, f"{code}:{_worker_id}")
+        await pipe.execute()
 
 
 async def delete_room(code: str) -> None:
-    await _r().delete(f"room:{code}")
+    _room_cache.pop(code, None)
+    async with _r().pipeline(transaction=False) as pipe:
+        pipe.delete(f"room:{code}")
+        pipe.publish(ROOM_UPDATES_CHANNEL, f"{code}:{_worker_id}")
+        await pipe.execute()
 
 
 async def room_exists(code: str) -> bool:
     return bool(await _r().exists(f"room:{code}"))
 
 
+# ── Pipelined bursts (one round trip instead of several) ──────────────────────
+
+async def set_room_and_sid(code: str, room: dict, sid: str, player_id: str) -> None:
+    """Write the room plus the sid mapping hash in a single round trip."""
+    data = {k: v for k, v in room.items() if k not in _SKIP}
+    _room_cache[code] = (time.monotonic(), data)
+    async with _r().pipeline(transaction=False) as pipe:
+        pipe.set(f"room:{code}", orjson.dumps(data), ex=ROOM_TTL)
+        pipe.hset(f"sid:{sid}", mapping={"room": code, "player": player_id})
+        pipe.expire(f"sid:{sid}", ROOM_TTL)
+        pipe.publish(ROOM_UPDATES_CHANNEL, f"{code}:{_worker_id}")
+        await pipe.execute()
+
+
 # ── Atomic round winner claim ─────────────────────────────────────────────────
 
 async def claim_round_win(code: str, round_id: str, claimer_id: str) -> bool:
@@ -68,29 +176,50 @@ async def claim_round_win(code: str, round_id: str, claimer_id: str) -> bool:
     return result is True
 
 
-# ── sid → room / player mappings ─────────────────────────────────────────────
+async def claim_round_win_and_score(
+    code: str, round_id: str, player_id: str
+) -> Optional[int]:
+    """
+    Atomically claim the round for `player_id` and increment their score in
+    the `room:{code}:scores` hash — one Lua call, one round trip. Returns the
+    new score, or None if the round was already claimed.
+    """
+    result = await _claim_and_score(
+        keys=[f"round_winner:{code}:{round_id}", f"room:{code}:scores"],
+        args=[player_id, player_id],
+    )
+    return int(result) if result is not None else None
 
-async def set_sid_room(sid: str, code: str) -> None:
-    await _r().set(f"sid_room:{sid}", code, ex=ROOM_TTL)
 
+async def init_scores(code: str, player_ids: list[str]) -> None:
+    """Create the per-room scores hash at game start (all zeroes)."""
+    if not player_ids:
+        return
+    async with _r().pipeline(transaction=False) as pipe:
+        pipe.delete(f"room:{code}:scores")
+        pipe.hset(f"room:{code}:scores", mapping={pid: 0 for pid in player_ids})
+        pipe.expire(f"room:{code}:scores", ROOM_TTL)
+        await pipe.execute()
 
-async def get_sid_room(sid: str) -> Optional[str]:
-    v = await _r().get(f"sid_room:{sid}")
-    return v.decode() if v else None
 
+async def delete_scores(code: str) -> None:
+    await _r().delete(f"room:{code}:scores")
 
-async def del_sid_room(sid: str) -> None:
-    await _r().delete(f"sid_room:{sid}")
 
+# ── sid → room / player mapping (one hash per sid) ───────────────────────────
 
-async def set_sid_player(sid: str, player_id: str) -> None:
-    await _r().set(f"sid_player:{sid}", player_id, ex=ROOM_TTL)
+async def set_sid(sid: str, code: str, player_id: str) -> None:
+    async with _r().pipeline(transaction=False) as pipe:
+        pipe.hset(f"sid:{sid}", mapping={"room": code, "player": player_id})
+        pipe.expire(f"sid:{sid}", ROOM_TTL)
+        await pipe.execute()
 
 
-async def get_sid_player(sid: str) -> Optional[str]:
-    v = await _r().get(f"sid_player:{sid}")
-    return v.decode() if v else None
+async def get_sid(sid: str) -> tuple[Optional[str], Optional[str]]:
+    """Return (room_code, player_id) for a sid — one HMGET."""
+    room, player = await _r().hmget(f"sid:{sid}", "room", "player")
+    return (room.decode() if room else None, player.decode() if player else None)
 
 
-async def del_sid_player(sid: str) -> None:
-    await _r().delete(f"sid_player:{sid}")
+async def del_sid(sid: str) -> None:
+    await _r().delete(f"sid:{sid}")
@@ -1,14 +1,23 @@
 import asyncio
 import base64
 import concurrent.futures
-import io
+import logging
 import os
 import random
 import time
 
+import cv2
 import numpy as np
+import orjson
 import socketio
-from PIL import Image
+
+# libjpeg-turbo decodes straight to a contiguous ndarray (SIMD IDCT +
+# chroma upsampling); fall back to cv2.imdecode when the native lib is absent
+try:
+    from turbojpeg import TurboJPEG, TJPF_RGB
+    _turbo_jpeg = TurboJPEG()
+except Exception:
+    _turbo_jpeg = None
 
 import metrics
 import redis_state
@@ -19,16 +28,60 @@ from game_state import (
     make_round,
     unique_player_name,
 )
+from clip_detector import frame_dhash
 from object_bank import get_all_ids, get_object
 
+# Handlers/levels are configured in main.py (queue-backed so the actual
+# stdout write happens off the event loop)
+log = logging.getLogger("seekr")
+
 # detector is injected by main.py after CLIPDetector is initialized
 detector = None
 
-# Single-threaded executor — keeps GPU/MPS inference serialised
-clip_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+# CLIP inference executor. One worker keeps GPU/MPS inference serialised;
+# on CUDA, CLIP_EXECUTOR_WORKERS can raise this so independent batches
+# overlap on per-thread streams (the detector allocates per-thread staging
+# buffers to match). Leave at 1 on MPS (single command queue) and CPU.
+clip_executor = concurrent.futures.ThreadPoolExecutor(
+    max_workers=max(1, int(os.getenv("CLIP_EXECUTOR_WORKERS", "1")))
+)
+
+# Frame decodes run here, in parallel across cores — libjpeg-turbo and
+# numpy release the GIL, and a separate pool keeps them from ever queuing
+# behind (or in front of) CLIP inference
+decode_executor = concurrent.futures.ThreadPoolExecutor(
+    max_workers=min(4, os.cpu_count() or 1)
+)
+
+# Micro-batching: frames from all players are coalesced for up to
+# BATCH_WINDOW seconds (or BATCH_MAX frames) and run as one forward pass
+BATCH_MAX = 16
+BATCH_WINDOW = 0.005
+
+# A frame whose dHash is within this Hamming distance of the last frame a
+# player ran through CLIP reuses that result — a camera held still shouldn't
+# keep buying ViT forwards
+HASH_SKIP_DISTANCE = 6
 
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
 
+class _OrjsonPacketJSON:
+    """orjson-backed stand-in for the json module socket.io serializes with.
+
+    orjson.dumps returns bytes and takes no kwargs, so adapt both; packet
+    encoding happens once per frame:result / player:frame emit, which makes
+    the C serializer worth it at 30fps × players.
+    """
+
+    @staticmethod
+    def dumps(obj, **kwargs) -> str:
+        return orjson.dumps(obj).decode()
+
+    @staticmethod
+    def loads(s, **kwargs):
+        return orjson.loads(s)
+
+
 # Socket.io with Redis pub/sub manager — events work across multiple uvicorn workers
 mgr = socketio.AsyncRedisManager(REDIS_URL)
 sio = socketio.AsyncServer(
@@ -37,58 +90,122 @@ sio = socketio.AsyncServer(
     cors_allowed_origins="*",
     logger=False,
     engineio_logger=False,
+    json=_OrjsonPacketJSON,
 )
 
+class LatestSlot:
+    """Single-frame mailbox: a newer put simply replaces the unread value.
+
+    Replaces asyncio.Queue(maxsize=1) on the frame path — no waiter lists,
+    no full/empty bookkeeping, and put is synchronous so enqueuing a frame
+    never yields to the loop.
+    """
+
+    __slots__ = ("_val", "_evt")
+
+    def __init__(self):
+        self._val = None
+        self._evt = asyncio.Event()
+
+    @property
+    def pending(self) -> bool:
+        return self._val is not None
+
+    def put(self, val) -> None:
+        self._val = val
+        self._evt.set()
+
+    async def get(self):
+        await self._evt.wait()
+        val, self._val = self._val, None
+        self._evt.clear()
+        return val
+
+
 # ── Process-local state (non-serialisable / per-worker ephemeral) ─────────────
 # These live in memory only; Redis holds the canonical room/player data.
-player_queues: dict[str, asyncio.Queue] = {}
+player_slots: dict[str, LatestSlot] = {}
 player_workers: dict[str, asyncio.Task] = {}
 _room_timer_tasks: dict[str, asyncio.Task] = {}
 
+# (frame, future) pairs consumed by _batch_dispatcher
+_batch_queue: asyncio.Queue = asyncio.Queue()
+_batch_task: asyncio.Task | None = None
+
+# Bumped at every round start; workers drop their cached dHash result when the
+# active object changes, since the same frame scores differently against new
+# text embeddings
+_round_epoch = 0
+
 # Local sid lookups — kept in sync with Redis for fast access from hot paths
 _local_sid_to_player: dict[str, str] = {}  # sid → player_id
+_local_player_to_sid: dict[str, str] = {}  # player_id → sid (reverse index)
 _local_sid_to_room: dict[str, str] = {}    # sid → room_code
 _frame_count: dict[str, int] = {}          # sid → count (for confidence sampling)
+_last_emit: dict[str, tuple[float, float]] = {}  # sid → (time, confidence) sent
+
+# frame:result emits are suppressed when the previous one was sent less than
+# EMIT_MIN_INTERVAL ago and the confidence moved less than EMIT_MIN_DELTA —
+# wins always go out
+EMIT_MIN_INTERVAL = 0.1
+EMIT_MIN_DELTA = 0.02
 
 
 # ─── helpers ──────────────────────────────────────────────────────────────────
 
 def _scores(room: dict) -> dict:
-    return {p["id"]: p["score"] for p in room["players"]}
+    # Scores live on the room object, maintained wherever players or wins
+    # change — no per-emit rebuild from the players list
+    return room["scores"]
 
 
-async def _enqueue_frame(sid: str, frame_rgb: np.ndarray):
-    """Put frame in queue, dropping stale frame if full (stay fresh)."""
-    q = player_queues.get(sid)
-    if not q:
-        return
-    if q.full():
-        try:
-            q.get_nowait()
-        except asyncio.QueueEmpty:
-            pass
-    await q.put(frame_rgb)
+def _shuffled_deck() -> list:
+    """A freshly shuffled copy of every object id; rounds pop off the end."""
+    ids = get_all_ids()
+    return random.sample(ids, len(ids))
+
+
+def _enqueue_frame(sid: str, frame_and_hash: tuple):
+    """Put frame in the player's slot; an unread stale frame is replaced."""
+    slot = player_slots.get(sid)
+    if slot is not None:
+        slot.put(frame_and_hash)
 
 
 async def _start_player_worker(sid: str, room_code: str):
+    global _batch_task
     if sid in player_workers:
         return
-    q: asyncio.Queue = asyncio.Queue(maxsize=1)
-    player_queues[sid] = q
+    player_slots[sid] = LatestSlot()
     player_workers[sid] = asyncio.create_task(_frame_worker(sid, room_code))
+    if _batch_task is None or _batch_task.done():
+        _batch_task = asyncio.create_task(_batch_dispatcher())
 
 
 async def _stop_player_worker(sid: str):
     task = player_workers.pop(sid, None)
     if task:
         task.cancel()
-    player_queues.pop(sid, None)
+    player_slots.pop(sid, None)
     _frame_count.pop(sid, None)
+    _last_emit.pop(sid, None)
+
 
+async def _stop_all_room_workers(room_code: str, room: dict | None = None):
+    """Cancel frame workers and timer for every player in this room.
 
-async def _stop_all_room_workers(room_code: str):
-    """Cancel frame workers and timer for every player in this room."""
-    sids_in_room = [s for s, c in _local_sid_to_room.items() if c == room_code]
+    With the room object available, players resolve to sids through the
+    reverse index — O(room size) instead of a scan over every connection in
+    the process.
+    """
+    if room is not None:
+        sids_in_room = [
+            s
+            for p in room["players"]
+            if (s := _local_player_to_sid.get(p["id"])) is not None
+        ]
+    else:
+        sids_in_room = [s for s, c in _local_sid_to_room.items() if c == room_code]
     for sid in sids_in_room:
         await _stop_player_worker(sid)
     timer = _room_timer_tasks.pop(room_code, None)
@@ -96,31 +213,90 @@ async def _stop_all_room_workers(room_code: str):
         timer.cancel()
 
 
+async def _batch_dispatcher():
+    """
+    Single coordinator that coalesces ready frames from every player into
+    one CLIP forward pass (up to BATCH_MAX frames or BATCH_WINDOW seconds),
+    then resolves each worker's future with its result.
+    """
+    loop = asyncio.get_running_loop()
+    # Hoisted out of the loop: one bound-method allocation total instead of
+    # one per batch
+    detect_batch = detector.detect_batch
+    queue_get = _batch_queue.get
+
+    while True:
+        item = await queue_get()
+        frames, futures = [item[0]], [item[1]]
+
+        deadline = loop.time() + BATCH_WINDOW
+        while len(frames) < BATCH_MAX:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                frame, fut = await asyncio.wait_for(queue_get(), remaining)
+            except asyncio.TimeoutError:
+                break
+            frames.append(frame)
+            futures.append(fut)
+
+        # Fire and keep collecting — with a multi-worker executor the next
+        # batch forms while this one runs; with one worker the pool itself
+        # serialises, so behaviour is unchanged. In-flight work is bounded by
+        # the one-frame-per-player slots.
+        asyncio.ensure_future(_resolve_batch(loop, detect_batch, frames, futures))
+
+
+async def _resolve_batch(loop, detect_batch, frames, futures):
+    try:
+        results = await loop.run_in_executor(clip_executor, detect_batch, frames)
+    except Exception as e:
+        for fut in futures:
+            if not fut.done():
+                fut.set_exception(RuntimeError(f"detect_batch failed: {e}"))
+        return
+    for fut, result in zip(futures, results):
+        if not fut.done():
+            fut.set_result(result)
+
+
 async def _frame_worker(sid: str, room_code: str):
     """
-    Per-player async worker. Pulls frames from the queue, runs CLIP in a
-    thread executor, sends confidence feedback, and fires a win when detected.
+    Per-player async worker. Pulls frames from the queue, hands them to the
+    batch dispatcher, sends confidence feedback, and fires a win when detected.
     """
-    loop = asyncio.get_event_loop()
-    q = player_queues[sid]
+    loop = asyncio.get_running_loop()
+    slot = player_slots[sid]
+    last_hash = 0
+    last_result: dict | None = None
+    last_epoch = -1
 
     while True:
         try:
-            frame_rgb = await asyncio.wait_for(q.get(), timeout=10.0)
+            frame_rgb, frame_hash = await asyncio.wait_for(slot.get(), timeout=10.0)
         except asyncio.TimeoutError:
             continue
         except asyncio.CancelledError:
             break
 
-        try:
-            result = await loop.run_in_executor(
-                clip_executor,
-                detector.detect_for_active_object,
-                frame_rgb,
-            )
-        except Exception as e:
-            print(f"[clip] worker error for {sid}: {e}")
-            continue
+        # Near-duplicate of the last frame we actually encoded (and the round
+        # hasn't changed) — reuse its result instead of buying a forward pass
+        if (
+            last_result is not None
+            and last_epoch == _round_epoch
+            and (frame_hash ^ last_hash).bit_count() < HASH_SKIP_DISTANCE
+        ):
+            result = last_result
+        else:
+            try:
+                future = loop.create_future()
+                await _batch_queue.put((frame_rgb, future))
+                result = await future
+            except Exception as e:
+                log.warning("[clip] worker error for %s: %s", sid, e)
+                continue
+            last_hash, last_result, last_epoch = frame_hash, result, _round_epoch
 
         # Metrics: count every frame, sample confidence every 10th
         await metrics.incr("frames_processed")
@@ -128,8 +304,20 @@ async def _frame_worker(sid: str, room_code: str):
         if _frame_count[sid] % 10 == 0:
             await metrics.hist_observe("frame_confidence", result["confidence"])
 
-        # Live confidence bar for this player only
-        await sio.emit("frame:result", result, to=sid)
+        # Live confidence bar for this player only. Consecutive frames mostly
+        # carry near-identical confidence, so throttle "none" results to
+        # ~10Hz unless the value actually moved — the UI can't show 30
+        # updates a second anyway, and each emit is a JSON encode + egress.
+        now = loop.time()
+        last = _last_emit.get(sid)
+        if (
+            result["label"] != "none"
+            or last is None
+            or now - last[0] >= EMIT_MIN_INTERVAL
+            or abs(result["confidence"] - last[1]) >= EMIT_MIN_DELTA
+        ):
+            _last_emit[sid] = (now, result["confidence"])
+            await sio.emit("frame:result", result, to=sid)
 
         if result["label"] != "none":
             await _handle_round_win(sid, room_code)
@@ -142,16 +330,14 @@ async def _start_next_round(room_code: str):
     if not room or room["phase"] != "game":
         return
 
-    used = set(room["usedObjectIds"])
-    available = [oid for oid in get_all_ids() if oid not in used]
-
-    if not available:
-        used = set()
-        available = get_all_ids()
-
-    object_id = random.choice(available)
-    used.add(object_id)
-    room["usedObjectIds"] = list(used)
+    # Objects come off a deck pre-shuffled at game start — one list pop per
+    # round, no per-round selection work or extra Redis round trips. Reshuffle
+    # when the deck runs dry.
+    deck = room.get("objectDeck")
+    if not deck:
+        deck = _shuffled_deck()
+    object_id = deck.pop()
+    room["objectDeck"] = deck
 
     obj = get_object(object_id)
     round_num = room["roundNumber"] + 1
@@ -162,16 +348,23 @@ async def _start_next_round(room_code: str):
 
     if detector:
         detector.set_active_object(object_id, obj)
+    global _round_epoch
+    _round_epoch += 1
 
     await metrics.incr("round_started")
     await metrics.object_incr("selected", object_id)
     await metrics.set_timestamp("round_started", room_code)
 
     timeout = room["settings"]["roundTimeout"]
+    # Bumping the generation invalidates any timer from a previous round
+    # without cancelling it — cancelled tasks leave tombstoned handles in the
+    # loop's scheduled heap until the sweep, which adds up on fast rounds
+    gen = room.get("timerGeneration", 0) + 1
+    room["timerGeneration"] = gen
     await redis_state.set_room(room_code, room)
 
     timer_task = asyncio.create_task(
-        _run_round_timeout(room_code, rnd["id"], timeout)
+        _run_round_timeout(room_code, rnd["id"], timeout, gen)
     )
     _room_timer_tasks[room_code] = timer_task
 
@@ -187,7 +380,7 @@ async def _start_next_round(room_code: str):
         },
         room=room_code,
     )
-    print(f"[game] round {round_num} → {obj['displayName']} in {room_code}")
+    log.info("[game] round %s → %s in %s", round_num, obj["displayName"], room_code)
 
 
 async def _handle_round_win(sid: str, room_code: str):
@@ -199,34 +392,38 @@ async def _handle_round_win(sid: str, room_code: str):
     if not current_round:
         return
 
-    player_id = _local_sid_to_player.get(sid) or await redis_state.get_sid_player(sid)
+    player_id = _local_sid_to_player.get(sid) or (await redis_state.get_sid(sid))[1]
     if not player_id:
         return
 
-    # Atomic claim — only the first caller across all workers wins
-    won = await redis_state.claim_round_win(room_code, current_round["id"], player_id)
-    if not won:
+    # Atomic claim + score bump — only the first caller across all workers
+    # wins, and the increment happens server-side in the same round trip
+    new_score = await redis_state.claim_round_win_and_score(
+        room_code, current_round["id"], player_id
+    )
+    if new_score is None:
         return
 
     winner = None
     for p in room["players"]:
         if p["id"] == player_id:
-            p["score"] += 1
             winner = p
             break
-
     if not winner:
+        # Claimer disconnected between frame and claim — disconnect already
+        # removed them and their score entry. Don't touch the (cached) room
+        # dict, or a ghost score leaks into later payloads.
         return
+    winner["score"] = new_score
+    room["scores"][player_id] = new_score
 
     current_round["winnerId"] = player_id
     current_round["winnerName"] = winner["name"]
     room["currentRound"] = current_round
     await redis_state.set_room(room_code, room)
 
-    # Cancel local timer (best-effort; may live on another worker)
-    timer = _room_timer_tasks.pop(room_code, None)
-    if timer:
-        timer.cancel()
+    # No timer cancel here: the generation bump at the next round:start (or
+    # the phase check after game end) retires the pending timeout task
 
     # Metrics
     round_ts = await metrics.get_timestamp("round_started", room_code)
@@ -238,7 +435,7 @@ async def _handle_round_win(sid: str, room_code: str):
     await metrics.incr("round_won")
     await metrics.object_incr("found", current_round["objectId"])
 
-    print(f"[game] round won by {winner['name']} in {room_code} (score: {winner['score']})")
+    log.info("[game] round won by %s in %s (score: %s)", winner["name"], room_code, winner["score"])
 
     await sio.emit(
         "round:won",
@@ -263,13 +460,20 @@ async def _handle_round_win(sid: str, room_code: str):
     await _start_next_round(room_code)
 
 
-async def _run_round_timeout(room_code: str, round_id: str, timeout_seconds: int):
+async def _run_round_timeout(
+    room_code: str, round_id: str, timeout_seconds: int, generation: int
+):
     await asyncio.sleep(timeout_seconds)
 
     room = await redis_state.get_room(room_code)
     if not room or room["phase"] != "game":
         return
 
+    # Stale timer from an already-finished round — a newer round bumped the
+    # generation, so this one just falls through
+    if room.get("timerGeneration") != generation:
+        return
+
     current_round = room.get("currentRound")
     if not current_round or current_round["id"] != round_id:
         return
@@ -283,7 +487,7 @@ async def _run_round_timeout(room_code: str, round_id: str, timeout_seconds: int
     await metrics.object_incr("timed_out", current_round["objectId"])
     await metrics.del_timestamp("round_started", room_code)
 
-    print(f"[game] round {round_id} timed out in {room_code}")
+    log.info("[game] round %s timed out in %s", round_id, room_code)
 
     await sio.emit(
         "round:timeout",
@@ -306,6 +510,7 @@ async def _end_game(room_code: str, winner_id: str, winner_name: str):
 
     room["phase"] = "results"
     await redis_state.set_room(room_code, room)
+    await redis_state.delete_scores(room_code)
 
     # Metrics
     game_ts = await metrics.get_timestamp("game_started", room_code)
@@ -316,7 +521,7 @@ async def _end_game(room_code: str, winner_id: str, winner_name: str):
     await metrics.hist_observe("game_rounds_played", room["roundNumber"])
     await metrics.gauge_decr("players_in_game", len(room["players"]))
 
-    await _stop_all_room_workers(room_code)
+    await _stop_all_room_workers(room_code, room)
 
     await sio.emit(
         "game:ended",
@@ -328,29 +533,34 @@ async def _end_game(room_code: str, winner_id: str, winner_name: str):
         },
         room=room_code,
     )
-    print(f"[game] game:ended → {room_code}, winner: {winner_name}")
+    log.info("[game] game:ended → %s, winner: %s", room_code, winner_name)
 
 
 # ─── connection events ────────────────────────────────────────────────────────
 
 @sio.event
 async def connect(sid, environ):
-    print(f"[socket] connect {sid}")
+    log.debug("[socket] connect %s", sid)
     await metrics.gauge_incr("connections_active")
 
 
 @sio.event
 async def disconnect(sid):
-    print(f"[socket] disconnect {sid}")
+    log.debug("[socket] disconnect %s", sid)
     await metrics.gauge_decr("connections_active")
 
     await _stop_player_worker(sid)
 
-    code = _local_sid_to_room.pop(sid, None) or await redis_state.get_sid_room(sid)
-    player_id = _local_sid_to_player.pop(sid, None) or await redis_state.get_sid_player(sid)
+    code = _local_sid_to_room.pop(sid, None)
+    player_id = _local_sid_to_player.pop(sid, None)
+    if player_id:
+        _local_player_to_sid.pop(player_id, None)
+    if code is None or player_id is None:
+        r_code, r_player = await redis_state.get_sid(sid)
+        code = code or r_code
+        player_id = player_id or r_player
 
-    await redis_state.del_sid_room(sid)
-    await redis_state.del_sid_player(sid)
+    await redis_state.del_sid(sid)
 
     if not code:
         return
@@ -362,9 +572,11 @@ async def disconnect(sid):
     was_in_game = room.get("phase") == "game"
 
     room["players"] = [p for p in room["players"] if p["id"] != player_id]
+    room["scores"].pop(player_id, None)
 
     if not room["players"]:
         await redis_state.delete_room(code)
+        await redis_state.delete_scores(code)
         await metrics.gauge_decr("rooms_active")
         if room.get("phase") == "lobby":
             await metrics.incr("lobby_abandoned")
@@ -379,10 +591,7 @@ async def disconnect(sid):
     if room["hostSid"] == sid:
         new_host = room["players"][0]
         room["hostId"] = new_host["id"]
-        new_host_sid = next(
-            (s for s, pid in _local_sid_to_player.items() if pid == new_host["id"]),
-            None,
-        )
+        new_host_sid = _local_player_to_sid.get(new_host["id"])
         if new_host_sid:
             room["hostSid"] = new_host_sid
 
@@ -401,11 +610,10 @@ async def room_create(sid, player_name: str):
     player = make_player(player_name)
     room = make_room(code, player, sid)
 
-    await redis_state.set_room(code, room)
-    await redis_state.set_sid_room(sid, code)
-    await redis_state.set_sid_player(sid, player["id"])
+    await redis_state.set_room_and_sid(code, room, sid, player["id"])
     _local_sid_to_room[sid] = code
     _local_sid_to_player[sid] = player["id"]
+    _local_player_to_sid[player["id"]] = sid
 
     await sio.enter_room(sid, code)
 
@@ -424,7 +632,7 @@ async def room_create(sid, player_name: str):
         },
         to=sid,
     )
-    print(f"[socket] room:create → {code} by {player['name']}")
+    log.info("[socket] room:create → %s by %s", code, player["name"])
 
 
 @sio.on("room:join")
@@ -445,12 +653,12 @@ async def room_join(sid, data: dict):
     final_name = unique_player_name(player_name, existing_names)
     player = make_player(final_name)
     room["players"].append(player)
+    room["scores"][player["id"]] = 0
 
-    await redis_state.set_room(code, room)
-    await redis_state.set_sid_room(sid, code)
-    await redis_state.set_sid_player(sid, player["id"])
+    await redis_state.set_room_and_sid(code, room, sid, player["id"])
     _local_sid_to_room[sid] = code
     _local_sid_to_player[sid] = player["id"]
+    _local_player_to_sid[player["id"]] = sid
 
     await sio.enter_room(sid, code)
 
@@ -465,7 +673,7 @@ async def room_join(sid, data: dict):
         to=sid,
     )
     await sio.emit("player:joined", player, room=code, skip_sid=sid)
-    print(f"[socket] room:join → {code} by {player['name']}")
+    log.info("[socket] room:join → %s by %s", code, player["name"])
 
 
 @sio.on("player:remove")
@@ -475,6 +683,7 @@ async def player_remove(sid, player_id: str):
     if not room or room["hostSid"] != sid:
         return
     room["players"] = [p for p in room["players"] if p["id"] != player_id]
+    room["scores"].pop(player_id, None)
     await redis_state.set_room(code, room)
     await sio.emit("player:left", player_id, room=code)
 
@@ -514,9 +723,11 @@ async def game_start(sid):
 
     room["phase"] = "game"
     room["roundNumber"] = 0
-    room["usedObjectIds"] = []
     room["currentRound"] = None
+    room["scores"] = {p["id"]: 0 for p in room["players"]}
+    room["objectDeck"] = _shuffled_deck()
     await redis_state.set_room(code, room)
+    await redis_state.init_scores(code, [p["id"] for p in room["players"]])
 
     # Metrics
     player_count = len(room["players"])
@@ -531,17 +742,16 @@ async def game_start(sid):
 
     # Start a frame worker for every player connected to this process
     for player in room["players"]:
-        for s, pid in list(_local_sid_to_player.items()):
-            if pid == player["id"]:
-                await _start_player_worker(s, code)
-                break
+        s = _local_player_to_sid.get(player["id"])
+        if s:
+            await _start_player_worker(s, code)
 
     await sio.emit(
         "game:started",
         {"players": room["players"], "settings": room["settings"]},
         room=code,
     )
-    print(f"[socket] game:start → {code}")
+    log.info("[socket] game:start → %s", code)
 
     await asyncio.sleep(1)
     await _start_next_round(code)
@@ -549,14 +759,63 @@ async def game_start(sid):
 
 # ─── frame submission ─────────────────────────────────────────────────────────
 
+def _decode_frame(payload: bytes | str) -> tuple[np.ndarray, int] | None:
+    """Decode a JPEG (raw bytes or base64 string) to a 224×224 RGB ndarray
+    plus its dHash. Runs in an executor — the hash rides along so the worker
+    never touches pixels on the event loop."""
+    try:
+        if isinstance(payload, str):
+            # rpartition strips a data-URI prefix in one C-level scan (and is
+            # a no-op pass-through when there's no comma)
+            _, sep, tail = payload.rpartition(",")
+            img_bytes = base64.b64decode(tail if sep else payload)
+        else:
+            img_bytes = payload
+        np_img = None
+        if _turbo_jpeg is not None:
+            try:
+                np_img = _turbo_jpeg.decode(img_bytes, pixel_format=TJPF_RGB)
+            except Exception:
+                np_img = None  # non-JPEG payload etc. — use the cv2 path
+        if np_img is None:
+            # cv2.imdecode handles PNG/WebP too and decodes in SIMD C, vs
+            # PIL's Image.open + convert which copies the buffer twice
+            bgr = cv2.imdecode(np.frombuffer(img_bytes, np.uint8), cv2.IMREAD_COLOR)
+            if bgr is None:
+                return None
+            np_img = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
+        # Clients that capture at 224×224 (the intended protocol) skip the
+        # resize entirely; anything else gets scaled down as a safety net.
+        # The resize output is a fresh allocation on purpose: the frame stays
+        # live long after this call (player slot → batch queue → a batch
+        # possibly parked behind a slow CLIP forward), so any reused buffer
+        # would be rewritten before the detector copies the pixels out.
+        if np_img.shape[0] == 224 and np_img.shape[1] == 224:
+            frame = np_img
+        else:
+            frame = cv2.resize(np_img, (224, 224), interpolation=cv2.INTER_AREA)
+        return frame, frame_dhash(frame)
+    except Exception:
+        return None
+
 @sio.on("frame:submit")
-async def frame_submit(sid, data: dict):
+async def frame_submit(sid, data):
     # Fast local check — no Redis needed here
     if sid not in player_workers:
         return
 
-    frame_b64: str = data.get("frameData", "")
-    if not frame_b64:
+    # Raw binary payloads (ArrayBuffer from the client) skip base64 entirely
+    # — 33% less bandwidth and no decode pass. Dicts may carry either bytes
+    # or the legacy data-URI string in frameData.
+    if isinstance(data, (bytes, bytearray)):
+        frame_payload = bytes(data)
+    elif isinstance(data, dict):
+        frame_payload = data.get("frameData", "")
+        if isinstance(frame_payload, bytearray):
+            frame_payload = bytes(frame_payload)
+    else:
+        return
+    if not frame_payload:
         return
 
     # Relay frame to other players in the room for live display
@@ -565,21 +824,24 @@ async def frame_submit(sid, data: dict):
     if code and player_id:
         await sio.emit(
             "player:frame",
-            {"playerId": player_id, "frameData": frame_b64},
+            {"playerId": player_id, "frameData": frame_payload},
             room=code,
             skip_sid=sid,
         )
 
-    try:
-        if "," in frame_b64:
-            frame_b64 = frame_b64.split(",", 1)[1]
-        img_bytes = base64.b64decode(frame_b64)
-        pil_img = Image.open(io.BytesIO(img_bytes)).convert("RGB")
-        # Resize to CLIP's native input size
-        pil_img = pil_img.resize((224, 224), Image.BILINEAR)
-        np_img = np.array(pil_img)
-    except Exception as e:
-        print(f"[frame] decode error for {sid}: {e}")
+    # Backpressure: if this player's slot already holds an unprocessed frame,
+    # decoding another would be wasted work — the slot would drop one anyway.
+    # The client sends a fresh frame ~33ms later.
+    slot = player_slots.get(sid)
+    if slot is not None and slot.pending:
+        return
+
+    # Decode off the event loop — PIL/cv2 release the GIL, and a 30fps
+    # decode inline here would starve other coroutines
+    loop = asyncio.get_running_loop()
+    decoded = await loop.run_in_executor(decode_executor, _decode_frame, frame_payload)
+    if decoded is None:
+        log.debug("[frame] decode error for %s", sid)
         return
 
-    await _enqueue_frame(sid, np_img)
+    _enqueue_frame(sid, decoded)